@@ -1,13 +1,25 @@
-from livekit.agents import Agent, function_tool, ChatContext, ChatMessage, StopResponse
-from utils.template_utils import load_template, save_prompt
+from livekit.agents import Agent
+from utils.template_utils import load_template, compile_template, save_prompt
 from components.tools import get_file_snapshot, get_interview_time_left, finish_interview
-from utils.shared_state import get_interview_controller, get_data_utils, get_session
+from utils.shared_state import get_interview_controller, get_data_utils
 import logging
-import time
-import asyncio
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
-session = None
+
+
+@lru_cache(maxsize=32)
+def _build_coding_instructions(question_id: str) -> str:
+    """
+    Build the coding agent instructions for a question.
+
+    The formatted prompt only depends on the question, so it is cached to
+    avoid reformatting the template on every agent handoff.
+    """
+    question_manager = get_interview_controller().question_manager
+    question_prompt = question_manager.get_question_prompt(question_id)
+    template = load_template('template_coding_agent')
+    return template.format(QUESTION=question_prompt)
 
 
 class CodingAgent(Agent):
@@ -20,11 +32,12 @@ class CodingAgent(Agent):
     def __init__(self):
         self.interview_controller = get_interview_controller()
         self.data_utils = get_data_utils()
-        question_prompt = self.interview_controller.question_manager.get_question_prompt(
+        self.file_watcher = self.interview_controller.file_watcher
+        self.template = _build_coding_instructions(
             self.interview_controller.question.id)
-        template = load_template('template_coding_agent')
-        self.template = template.format(QUESTION=question_prompt)
         save_prompt("coding_agent", self.template)
+        self._heartbeat_render = compile_template(
+            load_template("heartbeats/template_heartbeat_coding_agent"))
         super().__init__(
             instructions=self.template,
             tools=[get_file_snapshot, get_interview_time_left, finish_interview]
@@ -32,8 +45,6 @@ class CodingAgent(Agent):
 
         self.question = None
         self.last_code_snapshot = None
-        global session
-        session = get_session()
 
     async def on_enter(self):
         """Called when the agent enters the conversation"""
@@ -51,29 +62,17 @@ class CodingAgent(Agent):
             str: Formatted heartbeat context template
         """
         try:
-            # Load the template specific to this agent type
-            template_path = "heartbeats/template_heartbeat_coding_agent"
-            template = load_template(template_path)
-
             # Get context info from interview controller
-            interview_time = self.interview_controller.get_interview_time_since_start(
-                formatted=True)
-            time_since_last_interaction = time.time(
-            ) - self.interview_controller.last_activity_time
-            time_left = self.interview_controller.get_interview_time_left(
-                formatted=True)
+            time_context = self.interview_controller.get_tick_time_context()
             heartbeat_interval = self.interview_controller.heartbeat_interval
-            self.interview_controller.file_watcher._take_snapshot()
-            code_snapshot = self.interview_controller.file_watcher.last_snapshot
+            code_snapshot = self.file_watcher.last_snapshot
 
-            # Format the template with context
-            return template.format(
-                heartbeat_interval=heartbeat_interval,
-                interview_time=interview_time,
-                time_left=time_left,
-                current_code=code_snapshot,
-                time_since_last_interaction=time_since_last_interaction
-            )
+            # Render the pre-compiled template with context
+            return self._heartbeat_render({
+                "heartbeat_interval": heartbeat_interval,
+                "current_code": code_snapshot,
+                **time_context
+            })
         except Exception as e:
             logger.error(
                 f"Error loading heartbeat template for coding agent: {e}")
@@ -1,31 +1,45 @@
 import logging
 import os
-from pathlib import Path
+from functools import lru_cache
 from typing import Optional, List
+from aiofile import async_open
 from livekit.agents import llm, ChatContext
 from livekit.plugins import openai
-from utils.template_utils import load_template
+from utils.template_utils import load_template, compile_template
+from utils.config import MIN_TRANSCRIPT_CHARS
 from components.question_manager import QuestionManager
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def _get_question_manager() -> QuestionManager:
+    """Shared QuestionManager for evaluations run without one injected."""
+    return QuestionManager()
+
+
 class EvaluationAgent:
     """
     An agent that evaluates candidate performance in coding interviews
     based on transcription data and code snapshots.
     """
 
-    def __init__(self, transcription_path: str = "transcriptions.log", model: str = "gpt-4"):
+    def __init__(self, transcription_path: str = "transcriptions.log", model: str = "gpt-4",
+                 question_manager: Optional[QuestionManager] = None):
         """
         Initialize the evaluation agent with the path to transcription data.
 
         Args:
             transcription_path: Path to the transcription log file
             model: The LLM model to use for evaluation
+            question_manager: QuestionManager to look up the question prompt.
+                              Defaults to a shared process-wide instance.
         """
         self.transcription_path = transcription_path
         self.model = model
+        self.question_manager = question_manager or _get_question_manager()
+        # LLM client, created on first use so evaluations that exit early never build one
+        self._llm: Optional[openai.LLM] = None
 
     async def evaluate_candidate(self, chat_ctx: Optional[List[llm.ChatMessage]] = None) -> str:
         """
@@ -48,10 +62,16 @@ class EvaluationAgent:
             logger.error("No transcript data available for evaluation")
             return "ERROR: No transcript data available for evaluation"
 
+        # Skip the LLM call when there is too little to evaluate
+        if len(transcript_data.strip()) < MIN_TRANSCRIPT_CHARS:
+            logger.error("Transcript too short for evaluation")
+            return "ERROR: Transcript too short for evaluation"
+
         # Generate the evaluation using LLM and return raw text
         return await self._generate_evaluation(transcript_data)
 
-    def _parse_chat_context(self, chat_ctx: List[llm.ChatMessage]) -> str:
+    @staticmethod
+    def _parse_chat_context(chat_ctx: List[llm.ChatMessage]) -> str:
         """
         Parse chat context into a formatted transcript for evaluation.
 
@@ -61,12 +81,10 @@ class EvaluationAgent:
         Returns:
             Formatted transcript string
         """
-        transcript = ""
-        for msg in chat_ctx:
-            role = "USER" if msg.role == "user" else "AGENT"
-            transcript += f"[{role}]:\n{msg.content}\n\n"
-
-        return transcript
+        return ''.join(
+            f"[{'USER' if msg.role == 'user' else 'AGENT'}]:\n{msg.content}\n\n"
+            for msg in chat_ctx
+        )
 
     async def _read_transcription_file(self) -> Optional[str]:
         """
@@ -76,14 +94,12 @@ class EvaluationAgent:
             Formatted transcript string or None if file doesn't exist
         """
         try:
-            transcript_path = Path(self.transcription_path)
-            if not transcript_path.exists():
-                logger.error(
-                    f"Transcription file not found: {self.transcription_path}")
-                return None
-
-            with open(transcript_path, 'r') as f:
-                return f.read()
+            async with async_open(self.transcription_path, 'r') as f:
+                return await f.read()
+        except FileNotFoundError:
+            logger.error(
+                f"Transcription file not found: {self.transcription_path}")
+            return None
         except Exception as e:
             logger.error(f"Error reading transcription file: {e}")
             return None
@@ -98,30 +114,30 @@ class EvaluationAgent:
         Returns:
             Raw LLM response as a string
         """
-        # Load the evaluation template and format it with the transcript data
-        template = load_template("template_evaluation_agent.txt")
-        question_manager = QuestionManager()
-        question_prompt = question_manager.get_question_prompt(
+        # Render the pre-compiled evaluation template with the transcript data
+        render = compile_template(load_template("template_evaluation_agent.txt"))
+        question_prompt = self.question_manager.get_question_prompt(
             "valid_paranthesis")
-        prompt = template.format(
-            transcript_data=transcript_data, question=question_prompt)
+        prompt = render({
+            "transcript_data": transcript_data,
+            "question": question_prompt
+        })
 
         try:
-            # Use the OpenAI plugin directly
-            llm_instance = openai.LLM(model=self.model)
-
             # Create a chat context with the system prompt
             chat_ctx = ChatContext()
             chat_ctx.add_message(role="system", content=prompt)
 
             # Stream the response
-            full_response = ""
-            async with llm_instance.chat(chat_ctx=chat_ctx) as stream:
+            response_parts = []
+            if self._llm is None:
+                self._llm = openai.LLM(model=self.model)
+            async with self._llm.chat(chat_ctx=chat_ctx) as stream:
                 async for chunk in stream:
                     if chunk.delta and chunk.delta.content:
-                        full_response += chunk.delta.content
+                        response_parts.append(chunk.delta.content)
 
-            return full_response
+            return ''.join(response_parts)
         except Exception as e:
             logger.error(f"Error generating evaluation: {e}")
             return f"ERROR: Failed to generate evaluation: {str(e)}"
@@ -1,5 +1,5 @@
 from livekit.agents import Agent, function_tool
-from utils.template_utils import load_template
+from utils.template_utils import load_template, compile_template
 from utils.shared_state import get_interview_controller, get_data_utils
 from components.tools import get_interview_time_left
 from components.agents.coding_agent import CodingAgent
@@ -7,6 +7,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+GREETING = (
+    "Hello, and welcome to this AI-powered technical interview. "
+    "Today, you'll be solving a coding problem similar to what you might encounter in real technical interviews. "
+    "As your interviewer, I am here to help you through the process. "
+    "Before we start, could you briefly introduce yourself? "
+    "Also, please feel free to ask any questions about the process."
+)
+
 
 class IntroAgent(Agent):
     """
@@ -23,16 +31,12 @@ class IntroAgent(Agent):
         self.interview_controller = get_interview_controller()
         self.data_utils = get_data_utils()
         self.room = None
+        self._heartbeat_render = compile_template(
+            load_template("heartbeats/template_heartbeat_intro_agent"))
 
     async def on_enter(self):
         """Send the initial greeting to the user"""
-        await self.session.say(
-            """Hello, and welcome to this AI-powered technical interview. 
-            Today, you'll be solving a coding problem similar to what you might encounter in real technical interviews.
-            As your interviewer, I am here to help you through the process.
-            Before we start, could you briefly introduce yourself?
-            Also, please feel free to ask any questions about the process."""
-        )
+        await self.session.say(GREETING)
 
     def get_heartbeat_context(self) -> str:
         """
@@ -42,23 +46,16 @@ class IntroAgent(Agent):
             str: Formatted heartbeat context template
         """
         try:
-            # Load the template specific to this agent type
-            template_path = "heartbeats/template_heartbeat_intro_agent"
-            template = load_template(template_path)
-
             # Get context info from interview controller
-            interview_time = self.interview_controller.get_interview_time_since_start(
-                formatted=True)
-            time_left = self.interview_controller.get_interview_time_left(
-                formatted=True)
+            time_context = self.interview_controller.get_tick_time_context()
             heartbeat_interval = self.interview_controller.heartbeat_interval
 
-            # Format the template with context
-            return template.format(
-                heartbeat_interval=heartbeat_interval,
-                interview_time=interview_time,
-                time_left=time_left
-            )
+            # Render the pre-compiled template with context
+            return self._heartbeat_render({
+                "heartbeat_interval": heartbeat_interval,
+                "interview_time": time_context["interview_time"],
+                "time_left": time_context["time_left"]
+            })
         except Exception as e:
             logger.error(
                 f"Error loading heartbeat template for intro agent: {e}")
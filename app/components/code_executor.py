@@ -1,23 +1,24 @@
-import subprocess
-import os
+import sys
 import logging
 import time
-from typing import Dict, List
-import tempfile
-import shutil
-import importlib.util
-import traceback
+import hashlib
+import uuid
+from types import CodeType, ModuleType
+from typing import Callable, Dict, List, Tuple
 from utils.question_models import TestCase, Question
 
 logger = logging.getLogger(__name__)
 
+# Failing test cases beyond this many report the exception without a traceback
+MAX_ERROR_TRACEBACKS = 3
+
 
 class CodeExecutor:
     """Handles code execution directly using local Python interpreter"""
 
     def __init__(self):
         """
-        Initialize CodeExecutor by confirming Python interpreter availability
+        Initialize CodeExecutor with the running Python interpreter
         """
         self.execution_count = {
             "run": 0,
@@ -27,55 +28,23 @@ class CodeExecutor:
             "run": 0,
             "submit": 0
         }
+        # Compiled solution code by module name: (source digest, code object)
+        self._code_cache: Dict[str, Tuple[bytes, CodeType]] = {}
+        # Prepared test payloads by (question id, mode, test case count)
+        self._payload_cache: Dict[Tuple[str, str, int], List[Dict]] = {}
         CodeExecutor.cooldown_periods = {
             "run": 5,  # 5 seconds cooldown for run mode
             "submit": 30  # 30 seconds cooldown for submit mode
         }
 
-        try:
-            # Check if Python exists and get version
-            result = subprocess.run(
-                ["python3", "--version"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            self.python_version = result.stdout.strip()
-            logger.info(f"Found Python interpreter: {self.python_version}")
-
-            # Use python3 as primary command
-            self.python_cmd = "python3"
-
-        except (subprocess.SubprocessError, FileNotFoundError):
-            try:
-                # Try with python command if python3 fails
-                result = subprocess.run(
-                    ["python", "--version"],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                self.python_version = result.stdout.strip()
-                logger.info(f"Found Python interpreter: {self.python_version}")
-
-                # Use python as primary command
-                self.python_cmd = "python"
-
-            except (subprocess.SubprocessError, FileNotFoundError) as e:
-                logger.error(f"Failed to find Python interpreter: {e}")
-                raise Exception("No Python interpreter found on system")
-
-        # Extract major.minor version
-        import re
-        version_match = re.search(r'Python (\d+\.\d+)', self.python_version)
-        if version_match:
-            self.python_version_num = float(version_match.group(1))
-            if self.python_version_num < 3.6:
-                logger.warning(
-                    f"Python version {self.python_version_num} is below recommended version 3.6")
-        else:
-            logger.warning("Could not determine Python version number")
-            self.python_version_num = 0
+        # Tests run in-process, so the interpreter is the one we're running on
+        self.python_cmd = sys.executable
+        self.python_version = f"Python {sys.version.split()[0]}"
+        self.python_version_num = float(
+            f"{sys.version_info[0]}.{sys.version_info[1]}")
+        if sys.version_info < (3, 6):
+            logger.warning(
+                f"Python version {self.python_version_num} is below recommended version 3.6")
 
         logger.info(
             f"CodeExecutor initialized with Python: {self.python_version}")
@@ -100,20 +69,78 @@ class CodeExecutor:
 
     def _load_module_from_file(self, file_path: str, module_name: str):
         """
-        Dynamically load a Python module from a file path
+        Dynamically load a Python module from a file path.
+        The compiled code is reused while the file content is unchanged, but it is
+        executed into a fresh module on every call so no state carries over between runs.
 
         Args:
             file_path: Path to the Python file
-            module_name: Name to give the module
+            module_name: Base name for the module; each load gets a unique suffix
+                so concurrent runs never share a sys.modules entry
 
         Returns:
             Loaded module object
         """
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        with open(file_path, 'rb') as f:
+            source = f.read()
+        digest = hashlib.blake2b(source, digest_size=16).digest()
+
+        cached = self._code_cache.get(module_name)
+        if cached and cached[0] == digest:
+            code = cached[1]
+        else:
+            # optimize=0 keeps candidates' asserts and __debug__ checks live, as in a plain run
+            code = compile(source, file_path, 'exec', optimize=0)
+            self._code_cache[module_name] = (digest, code)
+
+        unique_name = f"{module_name}_{uuid.uuid4().hex}"
+        module = ModuleType(unique_name)
+        module.__file__ = file_path
+        # Registered only while executing so code that looks itself up (e.g. dataclasses) resolves
+        sys.modules[unique_name] = module
+        try:
+            exec(code, module.__dict__)
+        finally:
+            sys.modules.pop(unique_name, None)
         return module
 
+    def _run_test_case(self, func: Callable, tc: Dict) -> Dict:
+        """
+        Run a single test case
+
+        Args:
+            func: The bound Solution method under test
+            tc: Test case dictionary
+
+        Returns:
+            Dict containing the test case result
+        """
+        inputs = tc['inputs']
+        expected = tc['expected']
+
+        start_ns = time.perf_counter_ns()
+        try:
+            # Call the function with arguments
+            actual = func(*inputs)
+            success = actual == expected
+            error = None
+
+        except Exception as e:
+            actual = None
+            success = False
+            # Formatted by execute_tests once all cases have run
+            error = e
+
+        return {
+            'test_id': tc['id'],
+            'inputs': inputs,
+            'expected': expected,
+            'actual': actual,
+            'success': success,
+            'error': error,
+            'time': (time.perf_counter_ns() - start_ns) / 1e9
+        }
+
     def execute_tests(self, solution_path: str, test_cases: List[Dict], function_name: str) -> Dict:
         """
         Execute tests directly by importing the solution module
@@ -135,64 +162,41 @@ class CodeExecutor:
             if not hasattr(solution_module, "Solution"):
                 raise Exception("Solution class not found in solution file")
 
-            # Instantiate Solution class
-            solution = solution_module.Solution()
+            solution_class = solution_module.Solution
 
             # Check if the function exists in the Solution class
-            if not hasattr(solution, function_name):
+            if not hasattr(solution_class, function_name):
                 raise Exception(
                     f"Function {function_name} not found in Solution class")
 
-            # Run tests
-            results = []
-            passed_tests = 0
-            failed_tests = 0
-            total_time = 0
-
-            for tc in test_cases:
-                test_id = tc['id']
-                inputs = tc['inputs']
-                expected = tc['expected']
-
-                start_time = time.time()
-                try:
-                    # Call the function with arguments
-                    actual = getattr(solution, function_name)(*inputs)
-                    success = actual == expected
-                    error_msg = None
-
-                    if success:
-                        passed_tests += 1
-                    else:
-                        failed_tests += 1
-
-                except Exception as e:
-                    actual = None
-                    success = False
-                    error_msg = str(e) + "\n" + traceback.format_exc()
-                    failed_tests += 1
-
-                end_time = time.time()
-                test_time = end_time - start_time
-                total_time += test_time
-
-                results.append({
-                    'test_id': test_id,
-                    'inputs': inputs,
-                    'expected': expected,
-                    'actual': actual,
-                    'success': success,
-                    'error': error_msg,
-                    'time': test_time
-                })
+            # Resolve the method once on a single instance and reuse it for all cases
+            func = getattr(solution_class(), function_name)
+            run_test_case = self._run_test_case
+            results = [run_test_case(func, tc) for tc in test_cases]
+
+            passed_tests = sum(1 for r in results if r['success'])
+
+            # Only the first few failures get a full traceback; the rest a one-line summary
+            tracebacks_left = MAX_ERROR_TRACEBACKS
+            for r in results:
+                e = r['error']
+                if e is None:
+                    continue
+                if tracebacks_left:
+                    import traceback
+                    tracebacks_left -= 1
+                    r['error'] = str(e) + "\n" + "".join(
+                        traceback.format_exception(type(e), e, e.__traceback__))
+                else:
+                    r['error'] = f"{type(e).__name__}: {e}"
 
             # Prepare result
             return {
                 'results': results,
                 'passed_tests': passed_tests,
-                'failed_tests': failed_tests,
+                'failed_tests': len(results) - passed_tests,
                 'total_tests': len(test_cases),
-                'total_time': total_time
+                'total_time': sum(r['time'] for r in results)
             }
 
         except Exception as e:
@@ -216,18 +220,15 @@ class CodeExecutor:
         Returns:
             Dict containing execution results
         """
-        temp_dir = None
-
         # Check if we need to enforce a cooldown period
         current_time = time.time()
-        time_since_last_execution = current_time - \
-            self.execution_timer.get(mode, 0)
-        cooldown_period = CodeExecutor.cooldown_periods.get(mode, 0)
+        ready_at = self.execution_timer.get(mode, 0) + \
+            CodeExecutor.cooldown_periods.get(mode, 0)
 
-        if time_since_last_execution < cooldown_period:
+        if ready_at > current_time:
             # If in cooldown period, return a response indicating this
-            time_remaining = cooldown_period - time_since_last_execution
-            logger.info(
+            time_remaining = ready_at - current_time
+            logger.debug(
                 f"Cannot execute code in {mode} mode: cooldown period active ({time_remaining:.1f}s remaining)")
             return {
                 'success': False,
@@ -243,19 +244,16 @@ class CodeExecutor:
             # Select test cases based on mode
             test_cases = question.visible_test_cases if mode == "run" else question.all_test_cases
 
-            # Prepare test cases
-            test_case_dicts = self._prepare_test_payload(test_cases, mode)
-
-            # Create a temp directory for the solution file
-            temp_dir = tempfile.mkdtemp()
+            # Prepare test cases once per question and mode
+            payload_key = (question.id, mode, len(test_cases))
+            test_case_dicts = self._payload_cache.get(payload_key)
+            if test_case_dicts is None:
+                test_case_dicts = self._prepare_test_payload(test_cases, mode)
+                self._payload_cache[payload_key] = test_case_dicts
 
-            # Copy the solution file to the temp directory
-            temp_solution_path = os.path.join(temp_dir, 'solution.py')
-            shutil.copy2(test_file_path, temp_solution_path)
-
-            # Execute tests directly
+            # Execute tests directly against the solution file; it is only read
             results = self.execute_tests(
-                temp_solution_path,
+                test_file_path,
                 test_case_dicts,
                 question.function_name
             )
@@ -285,8 +283,3 @@ class CodeExecutor:
                 'error': str(e),
                 'mode': mode
             }
-
-        finally:
-            # Clean up temporary directory
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
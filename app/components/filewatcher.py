@@ -1,15 +1,61 @@
 import time
 import os
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import asyncio
+import hashlib
+import threading
+from collections import deque
+from itertools import islice
 from livekit.rtc import EventEmitter
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 import logging
-import json
+from utils.json_utils import json_loads
 
 logger = logging.getLogger("filewatcher")
 logger.setLevel(logging.INFO)
 
+# A path's callback fires once its change events have been quiet for this many seconds
+MODIFIED_DEBOUNCE_S = 0.05
+
+# Marker appended to snapshots that look mid-edit
+_WIP_SUFFIX = '[WORK IN PROGRESS] """'
+
+# Suffix of the sibling file written before being swapped over the watched file
+_TMP_SUFFIX = ".tmp"
+
+
+# One observer thread is shared by every FileWatcher; it runs while any watcher uses it
+_shared_observer = None  # watchdog Observer, created on first use
+_shared_observer_users = 0
+_shared_observer_lock = threading.Lock()
+
+
+def _acquire_observer():
+    """Return the shared observer, starting it for the first watcher."""
+    global _shared_observer, _shared_observer_users
+    with _shared_observer_lock:
+        if _shared_observer is None:
+            # Imported here so sessions that never watch don't load watchdog
+            from watchdog.observers import Observer
+            _shared_observer = Observer()
+            _shared_observer.start()
+        _shared_observer_users += 1
+        return _shared_observer
+
+
+def _release_observer():
+    """Drop one watcher's use of the shared observer, stopping it after the last."""
+    global _shared_observer, _shared_observer_users
+    with _shared_observer_lock:
+        _shared_observer_users -= 1
+        if _shared_observer_users == 0 and _shared_observer is not None:
+            _shared_observer.stop()
+            _shared_observer = None
+
+
+def content_hash(content: str) -> bytes:
+    """Return a short digest used to cheaply compare snapshot contents."""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).digest()
+
 
 class FileWatcher(EventEmitter):
     def __init__(self, path_to_watch):
@@ -27,18 +73,42 @@ class FileWatcher(EventEmitter):
         """
         super().__init__()
         self.path_to_watch = path_to_watch
-        self.observer = Observer()
         self.event_handler = None
+        self._watch = None  # Handle for this watcher's schedule on the shared observer
         self._last_modified = {}
 
-        # Initialize snapshot tracking
-        self.last_snapshot = ""
-        self.snapshot_history = {}
+        # Initialize snapshot tracking. Content and digest are published together as
+        # one tuple so readers never pair one snapshot's code with another's hash
+        self.snapshot = ("", content_hash(""))
+        # Held across each read/write and its snapshot update; they run in worker threads
+        self._snapshot_lock = threading.RLock()
+        self._poll_task: Optional[asyncio.Task] = None
         self.max_history = 100
+        # Oldest snapshots fall off the left end once max_history is reached
+        self.snapshot_history = deque(maxlen=self.max_history)
+
+        # Code updates arriving within write_batch_delay seconds are written once
+        self.write_batch_delay = 0.05
+        self._pending_content: Optional[str] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong reference to the running flush so it isn't garbage collected mid-write
+        self._flush_task: Optional[asyncio.Task] = None
+        # Serializes off-loop writes so they land on disk in call order
+        self._write_lock = asyncio.Lock()
 
         # Ensure the file exists
         self._ensure_file_exists()
 
+    @property
+    def last_snapshot(self) -> str:
+        """Content of the latest snapshot"""
+        return self.snapshot[0]
+
+    @property
+    def last_snapshot_hash(self) -> bytes:
+        """content_hash of the latest snapshot"""
+        return self.snapshot[1]
+
     def _ensure_file_exists(self):
         """Create the file if it doesn't exist and reset its contents"""
         os.makedirs(os.path.dirname(self.path_to_watch), exist_ok=True)
@@ -55,54 +125,160 @@ class FileWatcher(EventEmitter):
         Returns:
             bool: True if write was successful, False otherwise
         """
+        # A direct write supersedes any batched update still waiting to be flushed
+        self._cancel_pending_write()
+        return self._write_file(content)
+
+    async def write_content_async(self, content: str) -> bool:
+        """
+        Write new content to the file from a worker thread, keeping the
+        event loop free during disk I/O.
+
+        Args:
+            content (str): The content to write to the file
+
+        Returns:
+            bool: True if write was successful, False otherwise
+        """
+        self._cancel_pending_write()
+        async with self._write_lock:
+            return await asyncio.to_thread(self._write_file, content)
+
+    def _write_file(self, content: str) -> bool:
+        """Write content to disk and snapshot it; shared by the sync and async writers."""
         try:
-            with open(self.path_to_watch, 'w') as f:
-                f.write(content)
-            self._take_snapshot()  # Update snapshot after write
+            # Locked so a concurrent poller read can't publish the old file after this write
+            with self._snapshot_lock:
+                # Write to a sibling temp file and swap it in so readers never see a partial file
+                tmp_path = self.path_to_watch + _TMP_SUFFIX
+                with open(tmp_path, 'w') as f:
+                    f.write(content)
+                os.replace(tmp_path, self.path_to_watch)
+                # Update snapshot from what we just wrote, no need to read it back
+                self._take_snapshot(content=content)
             return True
         except Exception as e:
             logger.error("Error writing to file %s: %s", self.path_to_watch, e)
             return False
 
-    def _take_snapshot(self):
+    def schedule_write(self, content: str):
         """
-        Internal helper to read the file contents.
-        Updates the last_snapshot attribute and stores in history with timestamp.
-        Marks incomplete snapshots with [WORK IN PROGRESS] tag.
+        Queue content to be written shortly, coalescing bursts of updates.
+
+        Updates are full file contents, so only the latest one is written
+        once write_batch_delay seconds have passed since the first.
+
+        Args:
+            content (str): The content to write to the file
         """
-        try:
-            with open(self.path_to_watch, "r") as f:
-                current_content = f.read()
+        self._pending_content = content
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.write_batch_delay, self._start_flush)
 
-                # TODO: Experimenting with removing WIP detection
-                # # Check if snapshot appears incomplete
-                # if current_content and not current_content.endswith('\n'):
-                #     current_content += '\n""" [WORK IN PROGRESS] """'
+    def _start_flush(self):
+        """Run flush_pending as a task, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(self.flush_pending())
+        self._flush_task = task
 
-                current_time = time.time()
+        def _clear(done: asyncio.Task):
+            if self._flush_task is done:
+                self._flush_task = None
+            if not done.cancelled() and done.exception() is not None:
+                logger.error("Scheduled write failed: %s", done.exception())
 
-                # Update last snapshot
-                self.last_snapshot = current_content
+        task.add_done_callback(_clear)
 
-                # Add to history with timestamp
-                self.snapshot_history[current_time] = {
-                    'content': current_content,
-                    'timestamp': current_time,
-                    'is_complete': current_content.endswith('\n') and not current_content.endswith('[WORK IN PROGRESS] """')
-                }
+    async def flush_pending(self) -> bool:
+        """
+        Write any content queued by schedule_write immediately.
+
+        Returns:
+            bool: True if there was nothing to write or the write succeeded
+        """
+        content = self._pending_content
+        self._cancel_pending_write()
+        if content is None:
+            return True
+        async with self._write_lock:
+            return await asyncio.to_thread(self._write_file, content)
 
-                # Trim history if it exceeds max size
-                if len(self.snapshot_history) > self.max_history:
-                    oldest_key = min(self.snapshot_history.keys())
-                    del self.snapshot_history[oldest_key]
+    def _cancel_pending_write(self):
+        """Drop any queued content and its scheduled flush."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_content = None
 
-        except Exception as e:
-            logger.error("Error reading file %s: %s", self.path_to_watch, e)
-            self.last_snapshot = ""
+    def _take_snapshot(self, content: Optional[str] = None):
+        """
+        Internal helper to read the file contents.
+        Updates the last_snapshot attribute and stores in history with timestamp.
+        Marks incomplete snapshots with [WORK IN PROGRESS] tag.
+
+        Args:
+            content (Optional[str]): Content known to be on disk (e.g. just
+                written); used directly instead of reading the file.
+        """
+        with self._snapshot_lock:
+            try:
+                if content is None:
+                    with open(self.path_to_watch, "r") as f:
+                        content = f.read()
+            except Exception as e:
+                logger.error("Error reading file %s: %s", self.path_to_watch, e)
+                self.snapshot = ("", content_hash(""))
+                return self.last_snapshot
+
+            # TODO: Experimenting with removing WIP detection
+            # # Check if snapshot appears incomplete
+            # if content and not content.endswith('\n'):
+            #     content += '\n""" [WORK IN PROGRESS] """'
+
+            # Unchanged content (e.g. an mtime-only touch) isn't stored again
+            digest = content_hash(content)
+            if digest == self.last_snapshot_hash:
+                return self.last_snapshot
+
+            # Update last snapshot
+            self.snapshot = (content, digest)
+
+            # Add to history with timestamp
+            self.snapshot_history.append({
+                'content': content,
+                'timestamp': time.time(),
+                'is_complete': self.is_snapshot_complete(content)
+            })
+
+            return content
+
+    async def start_polling(self, interval: float = 0.5):
+        """
+        Keep last_snapshot up to date by polling the file in the background.
+
+        The file is only re-read when its modification time changes, and the
+        read runs in a worker thread. Consumers can then use last_snapshot
+        directly instead of reading from disk on demand.
 
-        return self.last_snapshot
+        Args:
+            interval (float): Seconds between modification time checks
+        """
+        # Kept so stop_watching can cancel the poller
+        self._poll_task = asyncio.current_task()
+        last_mtime = None
+        while True:
+            try:
+                mtime = os.stat(self.path_to_watch).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if mtime != last_mtime:
+                last_mtime = mtime
+                await asyncio.to_thread(self._take_snapshot)
 
-    def get_snapshot_history(self, limit: Optional[int] = None) -> dict:
+            await asyncio.sleep(interval)
+
+    def get_snapshot_history(self, limit: Optional[int] = None) -> List[dict]:
         """
         Get the history of file snapshots.
 
@@ -110,19 +286,9 @@ class FileWatcher(EventEmitter):
             limit (Optional[int]): Maximum number of recent snapshots to return
 
         Returns:
-            dict: Dictionary of timestamps and their corresponding snapshots
+            List[dict]: Snapshots ordered from most recent to oldest
         """
-        if not limit:
-            return self.snapshot_history
-
-        # Get the most recent 'limit' snapshots
-        sorted_times = sorted(self.snapshot_history.keys(), reverse=True)
-        recent_times = sorted_times[:limit]
-
-        return {
-            time: self.snapshot_history[time]
-            for time in recent_times
-        }
+        return list(islice(reversed(self.snapshot_history), limit or None))
 
     def get_snapshot_at_time(self, timestamp: float) -> Optional[str]:
         """
@@ -134,8 +300,10 @@ class FileWatcher(EventEmitter):
         Returns:
             Optional[str]: The snapshot content if found, None otherwise
         """
-        snapshot = self.snapshot_history.get(timestamp)
-        return snapshot['content'] if snapshot else None
+        for snapshot in self.snapshot_history:
+            if snapshot['timestamp'] == timestamp:
+                return snapshot['content']
+        return None
 
     def start_watching(self, callback: Optional[Callable] = None):
         """Start watching the specified path for changes.
@@ -143,41 +311,97 @@ class FileWatcher(EventEmitter):
         Args:
             callback (callable): Function to call when a file is saved
         """
+        from watchdog.events import FileSystemEventHandler
+
+        watcher = self
+
         class CustomHandler(FileSystemEventHandler):
             def __init__(self, callback=None):
                 super().__init__()
                 self._callback = callback
+                # Pending trailing-edge callback per path; events arrive on the observer thread
+                self._timers = {}
+                self._timers_lock = threading.Lock()
 
             def on_modified(self, event):
                 if not event.is_directory:
+                    self._notify(event.src_path)
+
+            def on_moved(self, event):
+                # write_content swaps a temp file over the target, which arrives as a move
+                if not event.is_directory:
+                    self._notify(event.dest_path)
+
+            def _notify(self, path):
+                # Our own temp file is an implementation detail of write_content
+                if path.endswith(_TMP_SUFFIX):
+                    return
+                # Editors save with several writes; restart the path's quiet window on
+                # every event so the callback sees the final write, not the first
+                timer = threading.Timer(MODIFIED_DEBOUNCE_S, self._fire, args=(path,))
+                timer.daemon = True
+                with self._timers_lock:
+                    previous = self._timers.get(path)
+                    if previous is not None:
+                        previous.cancel()
+                    self._timers[path] = timer
+                timer.start()
+
+            def _fire(self, path):
+                with self._timers_lock:
+                    if self._timers.get(path) is not threading.current_thread():
+                        return
+                    del self._timers[path]
+                try:
+                    # Skip events that didn't actually change the file
                     try:
-                        if self._callback:
-                            self._callback(event.src_path)
-                    except Exception as e:
-                        print(f"Error in file change callback: {e}")
+                        mtime = os.stat(path).st_mtime_ns
+                    except OSError:
+                        return
+                    if mtime == watcher._last_modified.get(path):
+                        return
+                    watcher._last_modified[path] = mtime
+
+                    if self._callback:
+                        self._callback(path)
+                except Exception as e:
+                    print(f"Error in file change callback: {e}")
+
+            def cancel_pending(self):
+                with self._timers_lock:
+                    for timer in self._timers.values():
+                        timer.cancel()
+                    self._timers.clear()
 
         self.event_handler = CustomHandler(callback)
-        self.observer.schedule(
+        self._watch = _acquire_observer().schedule(
             self.event_handler,
             path=os.path.dirname(self.path_to_watch) if os.path.isfile(
                 self.path_to_watch) else self.path_to_watch,
             recursive=False
         )
-        self.observer.start()
 
     def stop_watching(self):
         """Stop watching for file changes and reset the target file."""
-        if self.observer:
-            self.observer.stop()
-            # Reset the observer and event handler
-            self.event_handler = None
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            self._poll_task = None
+        if self._watch is not None:
+            # Only remove our schedule; other watchers may still use the observer
+            _shared_observer.unschedule(self._watch)
+            self._watch = None
+            _release_observer()
+        # Drop callbacks still waiting out their debounce window, then reset the handler
+        if self.event_handler is not None:
+            self.event_handler.cancel_pending()
+        self.event_handler = None
 
-            # Reset the contents of the target file
-            try:
-                with open(self.path_to_watch, 'w') as f:
-                    f.write('')
-            except IOError as e:
-                print(f"Error resetting file contents: {e}")
+        # Reset the contents of the target file
+        try:
+            with open(self.path_to_watch, 'w') as f:
+                f.write('')
+        except IOError as e:
+            print(f"Error resetting file contents: {e}")
 
     def get_current_file(self):
         """Get the current file contents."""
@@ -206,21 +430,18 @@ class FileWatcher(EventEmitter):
         Returns:
             bool: True if the snapshot is complete, False otherwise
         """
-        return (snapshot and
-                snapshot.endswith('\n') and
-                not snapshot.endswith('[WORK IN PROGRESS] """'))
+        return bool(snapshot) and snapshot.endswith('\n') and not snapshot.endswith(_WIP_SUFFIX)
 
     def on_data_received(self, data: bytes, topic: str):
         try:
             logger.info(f"Received data on topic: {topic}")
-            decoded = json.loads(data.decode('utf-8'))
+            decoded = json_loads(data)
             logger.info(f"Decoded data type: {decoded.get('type')}")
             if decoded.get('type') == 'code_update':
                 code = decoded.get('code', '')
                 # Log first 100 chars
-                logger.info(f"Attempting to write code: {code[:100]}...")
-                success = self.write_content(code)
-                logger.info(f"Write success: {success}")
+                logger.info(f"Queueing code write: {code[:100]}...")
+                self.schedule_write(code)
         except Exception as e:
             logger.error(
                 f"Error handling data channel message: {e}", exc_info=True)
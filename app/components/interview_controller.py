@@ -1,10 +1,11 @@
-from typing import Dict, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
+from array import array
 from components.question_manager import QuestionManager, Question
 import json
 from datetime import datetime, timedelta
 import asyncio
 import logging
-from components.filewatcher import FileWatcher
+from components.filewatcher import FileWatcher, content_hash
 from utils.shared_state import get_data_utils
 import time
 from livekit.agents.llm import ChatChunk
@@ -17,6 +18,26 @@ logger.setLevel(logging.INFO)
 
 TEST_FILE_PATH = "testing/test.py"
 
+# Static parts of the system note sent to the agent after a test run
+TEST_RESULTS_PROMPT_PREFIX = (
+    "The user has executed tests on their code with the following results:\n"
+)
+TEST_RESULTS_PROMPT_SUFFIX = (
+    "\n\nYou can use this information to better understand the user's code and any issues they're facing.\n"
+    "This is provided as additional context only - no response is needed specifically about these test results unless the user asks."
+)
+
+# Time updates have a fixed shape, so only the HH:MM:SS value is filled in per publish
+TIME_UPDATE_TOPIC = "interview-time"
+TIME_UPDATE_PAYLOAD = b'{"timeLeft": "%s"}'
+
+
+def format_hms(seconds: int) -> str:
+    """Format a number of seconds as 'HH:MM:SS'."""
+    minutes, remaining_seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{remaining_seconds:02d}"
+
 
 class InterviewController:
     def __init__(self, question_manager: QuestionManager):
@@ -27,11 +48,19 @@ class InterviewController:
 
         # Properties from former InterviewState
         self.question = None
-        self.code_snapshots = {}  # {id: {"code": str, "timestamp": int}}
+        # Code snapshots stored column-wise; a snapshot's id is its index
+        self._snapshot_codes: List[str] = []
+        self._snapshot_ts = array('l')  # Seconds since interview start
+        self._last_code_hash: Optional[bytes] = None  # Digest of the newest snapshot
         self.start_time = None
         self.stage_timestamps = {}
         self.end_time = None
+        # Monotonic counterparts of start_time/end_time used for elapsed-time math
+        self._start_monotonic: Optional[float] = None
+        self._end_monotonic: Optional[float] = None
+        self._duration_seconds = 0
         self.is_interview_complete = False
+        self._time_updates_task: Optional[asyncio.Task] = None
 
         # Other controller properties
         # self.llm = LLM(
@@ -48,23 +77,28 @@ class InterviewController:
         # Activity tracking
         self.heartbeat_interval = 45  # seconds
         self._heartbeat_task: Optional[asyncio.Task] = None
+        self.tick_id = 0  # Bumped on every heartbeat wake-up
+        self._tick_time_context = (None, None)  # (tick_id, context)
 
         # Speech activity tracking
         self.is_speech_active = False
+        # Set whenever activity or speech state changes so the heartbeat re-plans its wait
+        self._activity_event = asyncio.Event()
 
     def get_file_watcher(self) -> FileWatcher:
         """Get the FileWatcher instance"""
         return self.file_watcher
 
     def handle_code_update(self, code: str) -> bool:
-        """Handle code updates from the frontend"""
+        """
+        Handle code updates from the frontend.
+
+        The write is queued on the file watcher, which coalesces rapid updates
+        and writes only the latest one off the event loop.
+        """
         try:
-            success = self.file_watcher.write_content(code)
-            if not success:
-                logger.error("Failed to write code update to test.py")
-            else:
-                logger.info("Successfully wrote code update to test.py")
-            return success
+            self.file_watcher.schedule_write(code)
+            return True
         except Exception as e:
             logger.error(f"Error handling code update: {e}")
             return False
@@ -72,30 +106,63 @@ class InterviewController:
     def initialize_interview(self, question: Question):
         """Initialize the interview with the selected question"""
         self.question = question
-        self.code_snapshots = {}
+        self._snapshot_codes = []
+        self._snapshot_ts = array('l')
+        self._last_code_hash = None
         self.start_time = datetime.now()
         self.end_time = datetime.now() + timedelta(minutes=self.question.duration)
+        self._set_monotonic_window(self.question.duration)
         self.last_activity_time = time.time()
         asyncio.create_task(get_data_utils().reset_code_editor())
         logger.info(
             f"Interview initialized with duration: {self.question.duration} minutes")
 
+    def add_code_snapshot(self, code: str, code_hash: Optional[bytes] = None) -> str:
+        """
+        Record a code snapshot taken at the current interview time.
+        Code identical to the newest snapshot isn't stored again.
+
+        Args:
+            code: The code to store
+            code_hash: content_hash of the code, if the caller already has it
+
+        Returns:
+            str: The id of the stored snapshot (the existing one for a duplicate)
+        """
+        if code_hash is None:
+            code_hash = content_hash(code)
+        if code_hash == self._last_code_hash:
+            return str(len(self._snapshot_codes) - 1)
+        self._last_code_hash = code_hash
+
+        self._snapshot_codes.append(code)
+        self._snapshot_ts.append(self.get_interview_time_since_start())
+        return str(len(self._snapshot_codes) - 1)
+
+    def snapshots_view(self) -> Iterator[Dict[str, Union[str, int]]]:
+        """Yield stored code snapshots as {"id", "code", "timestamp"} dicts, oldest first"""
+        for i, (code, timestamp) in enumerate(zip(self._snapshot_codes, self._snapshot_ts)):
+            yield {"id": str(i), "code": code, "timestamp": timestamp}
+
+    def _set_monotonic_window(self, duration_minutes: float):
+        """Record the interview start and deadline on the monotonic clock"""
+        self._duration_seconds = int(duration_minutes * 60)
+        self._start_monotonic = time.monotonic()
+        self._end_monotonic = self._start_monotonic + self._duration_seconds
+
     def get_interview_time_since_start(self, formatted: bool = False) -> Union[int, str]:
         """
         Returns the current interview duration.
         Args:
             formatted (bool): If True, returns time in 'HH:MM:SS' format. If False, returns seconds.
         """
-        if not self.start_time:
+        if self._start_monotonic is None:
             return "00:00:00" if formatted else 0
 
-        seconds = int((datetime.now() - self.start_time).total_seconds())
+        seconds = int(time.monotonic() - self._start_monotonic)
 
         if formatted:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            remaining_seconds = seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{remaining_seconds:02d}"
+            return format_hms(seconds)
 
         return seconds
 
@@ -104,35 +171,62 @@ class InterviewController:
         Returns the time left in the interview.
         """
         time_since_start = self.get_interview_time_since_start(formatted=False)
-        time_left_seconds = int(self.question.duration * 60) - time_since_start
+        time_left_seconds = self._duration_seconds - time_since_start
 
         if formatted:
-            hours = time_left_seconds // 3600
-            minutes = (time_left_seconds % 3600) // 60
-            remaining_seconds = time_left_seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{remaining_seconds:02d}"
+            return format_hms(time_left_seconds)
 
         return time_left_seconds
 
+    def get_tick_time_context(self) -> Dict[str, Union[str, float]]:
+        """
+        Returns the time values used to render heartbeat context.
+
+        Values are computed once per heartbeat tick and shared by every
+        consumer rendering context during that tick.
+        """
+        tick_id, context = self._tick_time_context
+        if tick_id == self.tick_id:
+            return context
+
+        context = {
+            "interview_time": self.get_interview_time_since_start(formatted=True),
+            "time_left": self.get_interview_time_left(formatted=True),
+            "time_since_last_interaction": time.time() - self.last_activity_time
+        }
+        self._tick_time_context = (self.tick_id, context)
+        return context
+
     async def start_time_updates(self, room):
-        """Start publishing time updates to the room"""
+        """
+        Publish time updates to the room once a second until time runs out.
+
+        Ticks are scheduled against absolute loop-time deadlines so they
+        don't drift with publish latency.
+        """
+        self._time_updates_task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
         while True:
             if self.end_time:
                 time_left = self.get_interview_time_left(formatted=True)
-
-                payload = json.dumps({
-                    "timeLeft": time_left
-                }).encode('utf-8')
+                payload = TIME_UPDATE_PAYLOAD % time_left.encode('ascii')
 
                 try:
                     await room.local_participant.publish_data(
                         payload,
-                        topic="interview-time"
+                        topic=TIME_UPDATE_TOPIC
                     )
                 except Exception as e:
                     logger.error(f"Error publishing time update: {e}")
 
-            await asyncio.sleep(1)
+                # The final update has gone out; nothing left to count down
+                if self._end_monotonic - time.monotonic() <= 0:
+                    break
+
+            # Skip ahead rather than bursting if a tick ran late
+            next_tick = max(next_tick + 1, loop.time())
+            await asyncio.sleep(next_tick - loop.time())
 
     async def start_interview_timer(self, duration_minutes: int):
         """Start the interview with a specified duration"""
@@ -140,12 +234,15 @@ class InterviewController:
         self.start_time = datetime.now()
         self.end_time = self.start_time + \
             timedelta(minutes=duration_minutes)
+        self._set_monotonic_window(duration_minutes)
 
         logger.info(
             f"Interview end time set to: {self.end_time}")
 
-        # Start time updates when interview starts
-        asyncio.create_task(self.start_time_updates(self.room))
+        # Start time updates when interview starts; a running publisher picks up the new deadline
+        if self._time_updates_task is None or self._time_updates_task.done():
+            self._time_updates_task = asyncio.create_task(
+                self.start_time_updates(self.room))
 
 
     async def run_code(self, mode: str = "run") -> Dict:
@@ -155,8 +252,12 @@ class InterviewController:
         Args:
             mode: Either "run" (visible tests only) or "submit" (all tests)
         """
+        # Make sure the latest batched code update is on disk before running it
+        await self.file_watcher.flush_pending()
         test_file_path = self.file_watcher.path_to_watch
-        results = self.code_executor.run_code(
+        # Run in a worker thread so test execution doesn't stall the event loop
+        results = await asyncio.to_thread(
+            self.code_executor.run_code,
             test_file_path=test_file_path,
             question=self.question,
             mode=mode
@@ -210,8 +311,10 @@ class InterviewController:
         duration = self.get_interview_time_since_start(formatted=True)
         logger.info(f"Interview completed. Total duration: {duration}")
 
-        # Take final code snapshot
-        final_code = self.file_watcher._take_snapshot()
+        # Take final code snapshot, including any batched update not yet written
+        await self.file_watcher.flush_pending()
+        final_code = await asyncio.to_thread(
+            self.file_watcher._take_snapshot)
         final_results = await self.submit_code()
 
         data_utils = get_data_utils()
@@ -259,10 +362,12 @@ class InterviewController:
     def update_activity_timestamp(self):
         """Update the last activity timestamp to the current time"""
         self.last_activity_time = time.time()
+        self._activity_event.set()
 
     async def pause_heartbeat_timer(self):
         """Pause the heartbeat timer by setting speech active flag"""
         self.is_speech_active = True
+        self._activity_event.set()
         logger.info("Heartbeat timer paused - speech active")
 
     async def resume_heartbeat_timer(self):
@@ -276,13 +381,8 @@ class InterviewController:
         
         mode = results.get('mode', 'run')
         text_results = str(results)
-        prompt = f"""
-        The user has executed tests on their code with the following results:
-        {text_results}
-        
-        You can use this information to better understand the user's code and any issues they're facing.
-        This is provided as additional context only - no response is needed specifically about these test results unless the user asks.
-        """
+        prompt = ''.join(
+            (TEST_RESULTS_PROMPT_PREFIX, text_results, TEST_RESULTS_PROMPT_SUFFIX))
         ctx = self.current_agent.chat_ctx.copy()
         ctx.add_message(
             role="system",
@@ -307,22 +407,34 @@ class InterviewController:
             f"[DEBUG - interview_controller.py] Starting heartbeat with interval of {self.heartbeat_interval} seconds")
         while True:
             try:
+                self.tick_id += 1
+                self._activity_event.clear()
                 current_time = time.time()
 
-                # Skip inactivity check if speech is active
-                if not self.is_speech_active:
-                    idle_time = current_time - self.last_activity_time
+                # No inactivity check while speech is active; wait for it to end
+                if self.is_speech_active:
+                    await self._activity_event.wait()
+                    continue
+
+                idle_time = current_time - self.last_activity_time
 
-                    # Check if user has been inactive
-                    if idle_time > self.heartbeat_interval:
-                        logger.info(
-                            f"User has been inactive for {idle_time:.1f} seconds, triggering agent interaction")
-                        await self.trigger_heartbeat_interaction(self.current_agent)
-                        # Reset the activity time to avoid multiple triggers in a row
-                        self.last_activity_time = current_time
+                # Check if user has been inactive
+                if idle_time >= self.heartbeat_interval:
+                    logger.info(
+                        f"User has been inactive for {idle_time:.1f} seconds, triggering agent interaction")
+                    await self.trigger_heartbeat_interaction(self.current_agent)
+                    # Reset the activity time to avoid multiple triggers in a row
+                    self.last_activity_time = current_time
+                    continue
 
-                # Wait before next check
-                await asyncio.sleep(5)  # Check every 5 seconds
+                # Sleep until the user would cross the inactivity threshold,
+                # waking early if activity or speech state changes
+                try:
+                    await asyncio.wait_for(
+                        self._activity_event.wait(),
+                        timeout=self.heartbeat_interval - idle_time)
+                except asyncio.TimeoutError:
+                    pass
             except asyncio.CancelledError:
                 logger.info("Heartbeat task cancelled")
                 break
@@ -25,6 +25,7 @@ class QuestionManager:
         """
         self.questions_root = Path(QUESTION_PATH)
         self.questions: Dict[str, Question] = {}
+        self.question_prompts: Dict[str, str] = {}  # Formatted prompts by question id
         self.db_manager = DatabaseManager()
         self._load_questions()
 
@@ -92,6 +93,9 @@ class QuestionManager:
         """
         Provide the information to complete the agent prompt for the question
         """
+        if question_id in self.question_prompts:
+            return self.question_prompts[question_id]
+
         question = self.get_question(question_id)
         if not question:
             raise ValueError(f"Question {question_id} not found")
@@ -107,6 +111,7 @@ class QuestionManager:
         )
 
         save_prompt("question_context", formatted_prompt)
+        self.question_prompts[question_id] = formatted_prompt
         return formatted_prompt
 
     def get_solution(self, question_id: str) -> Optional[str]:
@@ -13,7 +13,6 @@ async def get_file_snapshot() -> str:
     Returns the latest snapshot of the code file.
     """
     interview_controller = get_interview_controller()
-    interview_controller.file_watcher._take_snapshot()
     return interview_controller.file_watcher.last_snapshot
 
 
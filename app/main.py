@@ -1,7 +1,7 @@
 import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from livekit.agents import AutoSubscribe, JobContext, WorkerOptions, AgentSession, cli, llm, RoomInputOptions, UserStateChangedEvent, AgentStateChangedEvent, ConversationItemAddedEvent
+from livekit.agents import AutoSubscribe, JobContext, JobProcess, WorkerOptions, AgentSession, cli, llm, RoomInputOptions, UserStateChangedEvent, AgentStateChangedEvent, ConversationItemAddedEvent
 from livekit.plugins import openai, silero, noise_cancellation
 from livekit.plugins.turn_detector.english import EnglishModel
 from components.question_manager import QuestionManager
@@ -13,7 +13,7 @@ import logging
 from livekit.rtc import DataPacket
 from livekit import api
 from utils.data_utils import DataUtils
-from utils.shared_state import set_state, set_session, get_interview_controller
+from utils.shared_state import set_state, set_session
 from fastapi import FastAPI
 # Import our new API setup utilities
 from utils.api_setup import setup_api
@@ -24,12 +24,31 @@ load_dotenv()
 
 QUESTION_NUMBER = 2
 
+# Fire-and-forget work from event listeners is tracked here so tasks are not
+# garbage collected mid-flight
+_background_tasks = set()
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """Schedule a coroutine from a sync event listener and keep a reference to it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
 # Create FastAPI instance
 app = FastAPI()
 # Setup API with CORS and routes
 setup_api(app)
 
 
+def prewarm(proc: JobProcess):
+    """Load models once per worker process so jobs can reuse them."""
+    proc.userdata["vad"] = silero.VAD.load(
+        max_buffered_speech=500
+    )
+
+
 async def entrypoint(ctx: JobContext):
     
     logger.info("[DEBUG] Starting entrypoint")
@@ -64,9 +83,7 @@ async def entrypoint(ctx: JobContext):
     interview_controller.current_agent = intro_agent
 
     session = AgentSession(
-        vad=silero.VAD.load(
-            max_buffered_speech=500
-        ),
+        vad=ctx.proc.userdata["vad"],
         stt=openai.STT(),
         llm=openai.LLM(model="gpt-4o"),
         tts=openai.TTS(),
@@ -83,7 +100,9 @@ async def entrypoint(ctx: JobContext):
 
     # Start the file watcher
     interview_controller.file_watcher.start_watching()
+    asyncio.create_task(interview_controller.file_watcher.start_polling())
     asyncio.create_task(data_utils.write_transcription())
+    asyncio.create_task(data_utils.process_speech_queue())
     asyncio.create_task(interview_controller.start_heartbeat())
     ########### START EVENT LISTENERS ###########
 
@@ -91,30 +110,28 @@ async def entrypoint(ctx: JobContext):
 
     @session.on("conversation_item_added")
     def on_conversation_item_added(ev: ConversationItemAddedEvent):
-        if ev.item.role == "user":
-            asyncio.create_task(
-                data_utils.handle_user_speech(ev.item.text_content))
-        elif ev.item.role == "assistant":
-            asyncio.create_task(
-                data_utils.handle_agent_speech(ev.item.text_content))
+        if ev.item.role in ("user", "assistant"):
+            data_utils.enqueue_speech(ev.item.role, ev.item.text_content)
+
+    # Bound once so turn-state listeners don't re-resolve them per event
+    pause_heartbeat_timer = interview_controller.pause_heartbeat_timer
+    resume_heartbeat_timer = interview_controller.resume_heartbeat_timer
 
     @session.on("user_state_changed")
     def on_user_state_changed(ev: UserStateChangedEvent):
-        interview_controller = get_interview_controller()
         if ev.old_state == "listening" and ev.new_state == "speaking":
             # on_user_turn_started
-            asyncio.create_task(interview_controller.pause_heartbeat_timer())
+            spawn_background(pause_heartbeat_timer())
 
     @session.on("agent_state_changed")
     def on_agent_state_changed(ev: AgentStateChangedEvent):
-        interview_controller = get_interview_controller()
         if ev.old_state == "speaking" and ev.new_state == "listening":
             # on_agent_turn_completed
-            asyncio.create_task(interview_controller.resume_heartbeat_timer())
+            spawn_background(resume_heartbeat_timer())
 
     @ctx.room.on("data_received")
     def handle_data_received(packet: DataPacket):
-        asyncio.create_task(data_utils.process_data_packet(packet))
+        spawn_background(data_utils.process_data_packet(packet))
 
     ########### END EVENT LISTENERS ###########
     
@@ -141,6 +158,7 @@ if __name__ == "__main__":
     try:
         cli.run_app(WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
             api_key=os.getenv('LIVEKIT_API_KEY'),
             api_secret=os.getenv('LIVEKIT_API_SECRET'),
             ws_url=os.getenv('LIVEKIT_URL'),
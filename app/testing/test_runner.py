@@ -23,32 +23,16 @@ class SolutionLoader:
 
     def load_solution(self) -> Optional[Any]:
         """
-        Dynamically loads the solution file and validates it has required function
+        Dynamically loads the solution file and validates it has required function.
+        The module is executed once; each call returns the method of a fresh
+        Solution instance so tests don't share instance state.
 
         Returns:
             Optional[Any]: The solution function if found and valid
         """
         try:
-            # Add typing imports to the module
-            import typing
-            import sys
-            sys.modules['typing'] = typing
-
-            # Create module spec from file path
-            spec = importlib.util.spec_from_file_location(
-                "solution_module",
-                self.solution_path
-            )
-            if not spec or not spec.loader:
-                raise ImportError("Failed to create module spec")
-
-            # Create module and execute it
-            self.solution_module = importlib.util.module_from_spec(spec)
-
-            # Add typing to module namespace
-            self.solution_module.List = typing.List
-
-            spec.loader.exec_module(self.solution_module)
+            if self.solution_module is None:
+                self.solution_module = self._exec_solution_module()
 
             # Get Solution class
             solution_class = getattr(self.solution_module, "Solution")
@@ -63,6 +47,30 @@ class SolutionLoader:
             logger.error(f"Failed to load solution: {str(e)}")
             return None
 
+    def _exec_solution_module(self) -> Any:
+        """Create and execute the solution module from the solution file"""
+        # Add typing imports to the module
+        import typing
+        import sys
+        sys.modules['typing'] = typing
+
+        # Create module spec from file path
+        spec = importlib.util.spec_from_file_location(
+            "solution_module",
+            self.solution_path
+        )
+        if not spec or not spec.loader:
+            raise ImportError("Failed to create module spec")
+
+        # Create module and execute it
+        solution_module = importlib.util.module_from_spec(spec)
+
+        # Add typing to module namespace
+        solution_module.List = typing.List
+
+        spec.loader.exec_module(solution_module)
+        return solution_module
+
 
 class TestRunner:
     def __init__(self, solution_path: str, function_name: str):
@@ -154,16 +162,19 @@ class TestRunner:
 def main():
     """Main entry point for the test runner"""
     if len(sys.argv) != 4:
-        print("Usage: python test_runner.py <solution_file_path> <function_name> <test_cases_json_path>")
+        print("Usage: python test_runner.py <solution_file_path> <function_name> <test_cases_json_path | ->")
         sys.exit(1)
 
     solution_path = sys.argv[1]
     function_name = sys.argv[2]
     test_cases_path = sys.argv[3]
 
-    # Read test cases from file
-    with open(test_cases_path) as f:
-        test_cases_json = f.read()
+    # Read test cases from file, or from stdin when the path is "-"
+    if test_cases_path == "-":
+        test_cases_json = sys.stdin.read()
+    else:
+        with open(test_cases_path) as f:
+            test_cases_json = f.read()
 
     try:
         # Parse test cases
@@ -4,3 +4,7 @@ import os
 DOCKER_API_BASE_URL = os.getenv(
     'DOCKER_API_BASE_URL', 'tcp://localhost:2376')  # Default to localhost
 DOCKER_IMAGE_NAME = "acilimeyva/python-test-runner:latest"
+
+# Evaluation configuration
+# Transcripts shorter than this are not worth an LLM evaluation call
+MIN_TRANSCRIPT_CHARS = int(os.getenv('MIN_TRANSCRIPT_CHARS', '200'))
@@ -2,43 +2,53 @@ import json
 import logging
 import asyncio
 import os
+import difflib
 from datetime import datetime
 from livekit.rtc import DataPacket
 from typing import Optional, Dict
 from pathlib import Path
 from aiofile import async_open
 from components.interview_controller import InterviewController
+from components.filewatcher import content_hash
+from utils.json_utils import json_loads
 from components.agents.evaluation_agent import EvaluationAgent
 from components.agents.coding_agent import CodingAgent
 
 logger = logging.getLogger(__name__)
 
+# Run/submit requests executing at once; a solution that never returns holds its slot
+MAX_CONCURRENT_CODE_RUNS = 2
+
 
 class DataUtils:
     def __init__(self, interview_controller: InterviewController):
         self.interview_controller = interview_controller
         self.log_queue = asyncio.Queue()
-        self.last_code_snapshot = ""  # Track the last code snapshot
+        self.speech_queue = asyncio.Queue(maxsize=256)  # (role, text) events
+        self.last_code_snapshot = ""  # Track the last logged code snapshot
+        self.last_code_snapshot_hash = content_hash("")  # Hash of the last logged code snapshot
         self.current_transcription_file = None  # Track current transcription file
+        # Only run/submit are gated so slow executions can't hold up editor updates
+        self.code_run_semaphore = asyncio.Semaphore(MAX_CONCURRENT_CODE_RUNS)
 
     async def process_data_packet(self, packet: DataPacket) -> None:
         """Process incoming data packets from the room."""
         try:
-            payload_str = packet.data.decode("utf-8")
-            payload = json.loads(payload_str)
+            payload = json_loads(packet.data)
             packet_type = payload.get("type")
 
             if packet_type == "code_update":
                 code_text = payload.get("code", "")
-                self.interview_controller.file_watcher.write_content(code_text)
+                self.interview_controller.file_watcher.schedule_write(code_text)
 
             elif packet_type == "run_code":
 
                 if isinstance(self.interview_controller.current_agent, CodingAgent):
 
-                    results = await self.interview_controller.run_code(
-                        mode="run"
-                    )
+                    async with self.code_run_semaphore:
+                        results = await self.interview_controller.run_code(
+                            mode="run"
+                        )
 
                     #
                     from rich import print as rich_print
@@ -50,9 +60,10 @@ class DataUtils:
             elif packet_type == "submit_code":
 
                 if isinstance(self.interview_controller.current_agent, CodingAgent):
-                    results = await self.interview_controller.run_code(
-                        mode="submit"
-                    )
+                    async with self.code_run_semaphore:
+                        results = await self.interview_controller.run_code(
+                            mode="submit"
+                        )
                     await self.send_results_to_frontend(results, state="submit")
 
         except json.JSONDecodeError:
@@ -83,21 +94,54 @@ class DataUtils:
         except Exception as e:
             logger.error(f"Error sending results to frontend: {e}")
 
+    def enqueue_speech(self, role: str, msg: str) -> None:
+        """
+        Queue a speech event for the speech worker without blocking the caller.
+
+        Args:
+            role: Either "user" or "assistant"
+            msg: The transcribed text
+        """
+        # Nothing to log for empty or whitespace-only turns
+        if not msg or msg.isspace():
+            return
+
+        try:
+            self.speech_queue.put_nowait((role, msg))
+        except asyncio.QueueFull:
+            # Deferring with a put task would reorder the transcript, so drop instead
+            logger.warning("Speech queue full, dropping %s speech event", role)
+
+    async def process_speech_queue(self) -> None:
+        """Handle queued speech events in arrival order."""
+        while True:
+            role, msg = await self.speech_queue.get()
+            try:
+                if role == "user":
+                    await self.handle_user_speech(msg)
+                else:
+                    await self.handle_agent_speech(msg)
+            except Exception as e:
+                logger.error(f"Error handling {role} speech: {e}")
+            finally:
+                self.speech_queue.task_done()
+
     async def handle_user_speech(self, msg: str) -> None:
         """Handle user speech events."""
-        # Take code snapshot
-        code_snapshot = self.interview_controller.file_watcher._take_snapshot()
+        # Read the code snapshot kept fresh by the file watcher's poller
+        file_watcher = self.interview_controller.file_watcher
+        code_snapshot, snapshot_hash = file_watcher.snapshot
 
-        # Only include code if it's changed
+        # Only include code if it's changed (compare digests, not full code)
         code_section = ""
-        has_code_changed = code_snapshot != self.last_code_snapshot
+        has_code_changed = snapshot_hash != self.last_code_snapshot_hash
 
-        # Only save to code_snapshots if different from last snapshot
+        # Only save a code snapshot if different from last snapshot
         if has_code_changed:
-            snapshot_id = str(len(self.interview_controller.code_snapshots))
-            self.interview_controller.code_snapshots[snapshot_id] = code_snapshot
+            self.interview_controller.add_code_snapshot(code_snapshot, snapshot_hash)
+            code_section = self._format_code_section(code_snapshot)
             self.last_code_snapshot = code_snapshot  # Update last snapshot
-            code_section = f"CODE:\n{code_snapshot}\n\n"
+            self.last_code_snapshot_hash = snapshot_hash
 
         # Log interaction with interview duration
         duration = self.interview_controller.get_interview_time_since_start()
@@ -108,6 +152,30 @@ class DataUtils:
             f"{'='*80}\n\n"
         )
 
+    def _format_code_section(self, code_snapshot: str) -> str:
+        """
+        Format the code section of a transcript entry.
+
+        Once a previous snapshot has been logged, only a unified diff against it
+        is included, unless the diff would be longer than the code itself.
+
+        Args:
+            code_snapshot: The current code snapshot
+
+        Returns:
+            The code section to append to the transcript entry
+        """
+        if self.last_code_snapshot:
+            diff = ''.join(difflib.unified_diff(
+                self.last_code_snapshot.splitlines(keepends=True),
+                code_snapshot.splitlines(keepends=True),
+                n=2
+            ))
+            if len(diff) < len(code_snapshot):
+                return f"CODE DIFF:\n{diff}\n\n"
+
+        return f"CODE:\n{code_snapshot}\n\n"
+
     async def handle_agent_speech(self, msg: str) -> None:
         """Handle agent speech events."""
         duration = self.interview_controller.get_interview_time_since_start()
@@ -163,8 +231,8 @@ class DataUtils:
             logger.info("Question data sent to frontend")
 
             # Update the file watcher with skeleton code if available
-            if hasattr(question, 'skeleton_code') and question.skeleton_code:
-                self.interview_controller.file_watcher.write_content(
+            if question.skeleton_code:
+                await self.interview_controller.file_watcher.write_content_async(
                     question.skeleton_code)
 
         except Exception as e:
@@ -191,7 +259,7 @@ class DataUtils:
             )
 
             # Also clear the file watcher
-            self.interview_controller.file_watcher.write_content("")
+            await self.interview_controller.file_watcher.write_content_async("")
 
             # Reset interview timer
             if self.interview_controller.question:
@@ -236,6 +304,13 @@ class DataUtils:
             Raw evaluation text from the LLM
         """
         try:
+            # Ensure queued speech has been turned into transcription entries
+            try:
+                await asyncio.wait_for(self.speech_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Timed out waiting for queued speech to be processed")
+
             # Ensure all pending transcription entries are written
             if self.log_queue.qsize() > 0:
                 logger.info(
@@ -247,8 +322,10 @@ class DataUtils:
                 return "ERROR: No transcription file available for evaluation"
 
             # Initialize evaluation agent with specified model
-            evaluator = EvaluationAgent(transcription_path=str(
-                self.current_transcription_file), model=model)
+            evaluator = EvaluationAgent(
+                transcription_path=str(self.current_transcription_file),
+                model=model,
+                question_manager=self.interview_controller.question_manager)
 
             # Generate evaluation (raw text)
             evaluation_text = await evaluator.evaluate_candidate(chat_ctx)
@@ -0,0 +1,9 @@
+"""Utility module for decoding JSON payloads."""
+
+import json
+
+# orjson is optional; it decodes bytes directly and much faster than the stdlib
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
@@ -1,16 +1,23 @@
 """Utility module for handling template loading."""
 
 import os
+import re
 import logging
-from typing import Optional
+import string
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
 def load_template(template_path: str, project_root: Optional[str] = None) -> str:
     """
     Load a template file from the templates directory.
 
+    Templates are static for the lifetime of the process, so results are
+    memoized and each file is only read from disk once.
+
     Args:
         template_path: Path to the template file, relative to templates directory
                       (e.g. 'template_select_tables' or 'template_select_tables.txt')
@@ -53,6 +60,55 @@ def load_template(template_path: str, project_root: Optional[str] = None) -> str
         raise
 
 
+@lru_cache(maxsize=None)
+def compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """
+    Pre-parse a str.format style template into a render function.
+
+    The template is parsed once into literal segments and replacement fields,
+    so rendering only has to look up the values and join the pieces.
+
+    Fields are resolved like str.format_map, including attribute and index
+    lookups such as {a.b} or {a[0]}.
+
+    Args:
+        template: Template text using str.format placeholders
+
+    Returns:
+        Callable[[Dict[str, Any]], str]: Function rendering the template from a dict of values
+
+    Raises:
+        ValueError: If the template uses positional fields ({} or {0}) or
+            nested replacement fields in a format spec ({x:{w}})
+    """
+    formatter = string.Formatter()
+    segments = []
+    for literal, field_name, format_spec, conversion in formatter.parse(template):
+        if literal:
+            segments.append((literal, None, None, None))
+        if field_name is not None:
+            first = re.split(r'[.\[]', field_name, maxsplit=1)[0]
+            if not first or first.isdigit():
+                raise ValueError(f"Positional field {{{field_name}}} is not supported in templates")
+            if format_spec and '{' in format_spec:
+                raise ValueError(f"Nested format spec in field {{{field_name}}} is not supported in templates")
+            segments.append((None, field_name, format_spec, conversion))
+
+    def render(values: Dict[str, Any]) -> str:
+        parts = []
+        for literal, field_name, format_spec, conversion in segments:
+            if field_name is None:
+                parts.append(literal)
+                continue
+            value, _ = formatter.get_field(field_name, (), values)
+            if conversion:
+                value = formatter.convert_field(value, conversion)
+            parts.append(format(value, format_spec))
+        return ''.join(parts)
+
+    return render
+
+
 def save_prompt(prompt_name: str, content: str, project_root: Optional[str] = None) -> None:
     """
     Write content to a prompt file in the prompts directory.